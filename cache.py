@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+import orjson
+
+__all__ = ['get_response', 'put_response', 'get_user', 'put_user',
+           'get_site', 'put_site', 'close']
+
+# On-disk cache shared by all runs (and all worker threads of a run)
+CACHE_PATH = '.starreach_cache.db'
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _connect():
+    """Open the cache database on first use."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute('PRAGMA journal_mode=WAL')
+        _conn.execute(
+            'CREATE TABLE IF NOT EXISTS http_cache '
+            '(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+            'body BLOB NOT NULL, expires_at REAL NOT NULL)'
+        )
+        _conn.execute(
+            'CREATE TABLE IF NOT EXISTS user_cache '
+            '(login TEXT PRIMARY KEY, json BLOB NOT NULL, ts INTEGER NOT NULL)'
+        )
+        _conn.execute(
+            'CREATE TABLE IF NOT EXISTS site_cache '
+            '(url TEXT PRIMARY KEY, status TEXT NOT NULL, linkedin TEXT, '
+            'fetched_at INTEGER NOT NULL)'
+        )
+    return _conn
+
+
+def close():
+    """Close the cache database (it is reopened on next use)."""
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+def get_response(url):
+    """
+    Return the cached (etag, last_modified, body, expires_at) tuple for a
+    GET `url`, or None. Until `expires_at` (epoch seconds) the body may be
+    reused as-is; after that it must be revalidated with the validators.
+    """
+    with _lock:
+        return _connect().execute(
+            'SELECT etag, last_modified, body, expires_at FROM http_cache WHERE url = ?',
+            (url,),
+        ).fetchone()
+
+
+def put_response(url, etag, last_modified, body, expires_at):
+    """Store the validators, raw body and freshness deadline of a GET `url`."""
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO http_cache '
+            '(url, etag, last_modified, body, expires_at) VALUES (?, ?, ?, ?, ?)',
+            (url, etag, last_modified, body, expires_at),
+        )
+        conn.commit()
+
+
+def get_user(login, max_age):
+    """
+    Return the cached /users/{login} profile for `login`, or None if there
+    is none or it was fetched more than `max_age` seconds ago.
+    """
+    with _lock:
+        row = _connect().execute(
+            'SELECT json, ts FROM user_cache WHERE login = ?', (login,)
+        ).fetchone()
+    if row is None or time.time() - row[1] >= max_age:
+        return None
+    return orjson.loads(row[0])
+
+
+def put_user(login, data):
+    """Store the /users/{login} profile for `login`, stamped with the fetch time."""
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO user_cache (login, json, ts) VALUES (?, ?, ?)',
+            (login, orjson.dumps(data), int(time.time())),
+        )
+        conn.commit()
+
+
+def get_site(url):
+    """Return the cached (status, linkedin, fetched_at) crawl result for `url`, or None."""
+    with _lock:
+        return _connect().execute(
+            'SELECT status, linkedin, fetched_at FROM site_cache WHERE url = ?', (url,)
+        ).fetchone()
+
+
+def put_site(url, status, linkedin=None):
+    """Store the outcome of crawling the site at `url`."""
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO site_cache (url, status, linkedin, fetched_at) '
+            'VALUES (?, ?, ?, ?)',
+            (url, status, linkedin, int(time.time())),
+        )
+        conn.commit()
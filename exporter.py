@@ -0,0 +1,176 @@
+import os
+import csv
+import threading
+import pandas as pd
+import openpyxl
+import xlsxwriter
+
+__all__ = ['COLUMNS', 'checkpoint_path', 'load_existing_users', 'ExcelStreamWriter']
+
+# Output column order — most important stuff first
+COLUMNS = [
+    'Name', 'Found_LinkedIn', 'LinkedIn_Source', 'Bio',
+    'Company', 'Email', 'Hireable', 'Twitter', 'Website',
+    'All_Social_Links', 'Followers', 'Following',
+    'Public_Repos', 'Public_Gists',
+    'Username', 'GitHub_URL', 'Avatar_URL',
+    'Created_At', 'Updated_At', 'Location',
+]
+
+
+def checkpoint_path(path):
+    """CSV journal that new rows are appended to while `path` is being built."""
+    return os.path.splitext(path)[0] + '.partial.csv'
+
+
+def _frame_to_rows(df):
+    """Turn a DataFrame into row dicts, with empty (NaN) cells as None."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _read_workbook_rows(path):
+    """
+    Read the first sheet of `path` as row dicts keyed by header, keeping
+    only the exported columns. Uses openpyxl's read-only mode, which streams
+    the sheet XML, and returns raw cell values (empty cells are None).
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        keep = [(i, name) for i, name in enumerate(header) if name in COLUMNS]
+        if 'Username' not in {name for _, name in keep}:
+            return []
+        return [
+            {name: row[i] if i < len(row) else None for i, name in keep}
+            for row in rows if any(cell is not None for cell in row)
+        ]
+    finally:
+        wb.close()
+
+
+def _set_aside(journal):
+    """
+    Move an unreadable journal out of the way (to '<journal>.bad', never
+    overwriting an earlier one) so the next writer neither appends to it nor
+    deletes it. Returns the new path.
+    """
+    target = f"{journal}.bad"
+    n = 1
+    while os.path.exists(target):
+        n += 1
+        target = f"{journal}.{n}.bad"
+    os.replace(journal, target)
+    return target
+
+
+def load_existing_users(path):
+    """
+    Load the rows of a previous export so a run can resume, with empty cells
+    as None, plus any rows journaled by a run that crashed before saving.
+    Returns [] if nothing usable is found. A journal that can't be read
+    (e.g. cut off mid-row) is set aside as '*.bad' rather than lost.
+    """
+    rows = []
+    if os.path.exists(path):
+        print(f"Found existing '{path}', loading to resume...")
+        try:
+            # Straight from openpyxl rather than through a DataFrame: the
+            # rows are only replayed into the new workbook, so there's
+            # nothing for pandas to do but allocate.
+            rows = _read_workbook_rows(path)
+            if rows:
+                print(f"Loaded {len(rows)} existing records.")
+        except Exception as e:
+            print(f"Could not load existing file: {e}")
+
+    journal = checkpoint_path(path)
+    if os.path.exists(journal):
+        try:
+            # Logins like '1234' must stay strings to match processed usernames,
+            # and only empty cells are missing: 'null', 'NA', 'nan' etc. are
+            # real logins and names, not pandas' default NA markers
+            df = pd.read_csv(journal, usecols=lambda c: c in COLUMNS, dtype={'Username': str},
+                             keep_default_na=False, na_values=[''])
+            if 'Username' not in df.columns:
+                raise ValueError("no 'Username' column")
+            seen = {row['Username'] for row in rows}
+            recovered = [row for row in _frame_to_rows(df) if row['Username'] not in seen]
+            rows.extend(recovered)
+            print(f"Recovered {len(recovered)} records from unfinished run ('{journal}').")
+        except Exception as e:
+            # Its rows weren't merged, so it must not be appended to and then
+            # removed once the new workbook is saved
+            kept = _set_aside(journal)
+            print(f"Could not load '{journal}': {e}. Kept it as '{kept}' for manual recovery.")
+
+    return rows
+
+
+class ExcelStreamWriter:
+    """
+    Streams rows into an xlsxwriter workbook in constant_memory mode: each
+    row is flushed to a temp file once the next one starts, instead of being
+    collected into a DataFrame, so memory stays flat no matter how many
+    stargazers are exported.
+
+    The workbook itself is only written on close(), so new rows are also
+    journaled to a CSV checkpoint (see checkpoint_path) as they arrive. If
+    the run dies before saving, load_existing_users() picks them up again;
+    once the workbook is saved the journal is removed.
+    """
+
+    def __init__(self, path, columns=COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.count = 0
+        self.lock = threading.Lock()
+        self.wb = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            # Keep cell text as-is (bios starting with '=', raw URLs)
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        self.ws = self.wb.add_worksheet('Leads')
+        self.ws.write_row(0, 0, columns)
+
+        self.journal_path = checkpoint_path(path)
+        self.journal = open(self.journal_path, 'a', newline='', encoding='utf-8')
+        self.journal_writer = csv.writer(self.journal)
+        if self.journal.tell() == 0:
+            self.journal_writer.writerow(columns)
+
+    def append(self, row, checkpoint=True):
+        """
+        Append a row dict, projected onto the output columns. Rows that are
+        already persisted elsewhere (resumed rows) pass checkpoint=False to
+        skip the journal. Thread-safe.
+        """
+        values = [row.get(c) for c in self.columns]
+        with self.lock:
+            self.count += 1
+            self.ws.write_row(self.count, 0, values)
+            if checkpoint:
+                self.journal_writer.writerow(values)
+                self.journal.flush()
+
+    def close(self):
+        """
+        Save the workbook, falling back to a second file name if that fails
+        (the journal is then kept, since `path` still lacks the new rows).
+        """
+        print("\nSaving progress...")
+        self.journal.close()
+        try:
+            self.wb.close()
+            print(f"Done! Saved {self.count} records to '{self.path}'.")
+            os.remove(self.journal_path)
+        except Exception as save_err:
+            # xlsxwriter allows close() to be retried with a new filename
+            # (e.g. when the target is open in Excel).
+            root, ext = os.path.splitext(self.path)
+            fallback = f"{root}.recovered{ext}"
+            print(f"Excel save failed ({save_err}), saving to '{fallback}' instead...")
+            self.wb.filename = fallback
+            self.wb.close()
+            print(f"Saved {self.count} records to '{fallback}'.")
@@ -1,6 +1,7 @@
 import pandas as pd
 from playwright.sync_api import sync_playwright
 import os
+import re
 import argparse
 
 # The message you wanted to send (printed for easy copying)
@@ -10,6 +11,16 @@ I'm the creator (2nd year at IIITG). I'm currently looking for a summer internsh
 
 If you, your team, or anyone you know is looking for an intern, I'd love to connect!"""
 
+# Images, video and fonts aren't needed to read a profile or its buttons;
+# blocked once logged in (login stays unfiltered so captchas still render).
+# Matching a URL pattern lets Playwright intercept only these requests, so
+# everything else loads without a round-trip through Python.
+BLOCKED_URL_RE = re.compile(
+    r'^https://media\.licdn\.com/'
+    r'|\.(?:png|jpe?g|gif|webp|avif|svg|ico|woff2?|ttf|otf|mp4|webm)(?:\?|$)',
+    re.IGNORECASE,
+)
+
 
 def detect_connection_status(page, timeout_ms=5000):
     """
@@ -29,11 +40,9 @@ def detect_connection_status(page, timeout_ms=5000):
         return 'unknown'
 
     # Read the actual button labels from LinkedIn's artdeco button spans
-    button_labels = set()
-    for btn in page.query_selector_all('div.pvs-profile-actions span.artdeco-button__text'):
-        text = btn.inner_text().strip().lower()
-        if text:
-            button_labels.add(text)
+    # (all_inner_texts fetches every label in one browser round-trip)
+    labels = page.locator('div.pvs-profile-actions span.artdeco-button__text').all_inner_texts()
+    button_labels = {text.strip().lower() for text in labels if text.strip()}
 
     if not button_labels:
         return 'unknown'
@@ -70,9 +79,12 @@ def main():
         print("Error: 'Found_LinkedIn' column not found in Excel.")
         return
         
-    leads = df[df['Found_LinkedIn'].notna()]
-    urls = leads['Found_LinkedIn'].tolist()
-    names = leads['Name'].tolist()
+    # Plain substring match (regex=False) with na=False covers the NaN check
+    # in the same pass; astype('string') keeps .str usable on an all-empty column
+    mask = df['Found_LinkedIn'].astype('string').str.contains(
+        'linkedin.com', case=False, na=False, regex=False)
+    urls = df.loc[mask, 'Found_LinkedIn'].tolist()
+    names = df.loc[mask, 'Name'].tolist()
     
     total_leads = len(urls)
     offset = args.offset
@@ -111,6 +123,7 @@ def main():
         input("\n>>> Press ENTER here once you are logged in and ready to start <<<")
 
         print("\n--- STEP 2: OUTREACH ---")
+        context.route(BLOCKED_URL_RE, lambda route: route.abort())
         
         for i, url in enumerate(urls):
             name = names[i] if pd.notna(names[i]) else "there"
@@ -120,9 +133,9 @@ def main():
             print(f"URL: {url}")
             
             try:
+                # No fixed delay after this: status detection below waits for
+                # the actions section itself
                 page.goto(url, wait_until='domcontentloaded')
-                # Small wait for dynamic content to render
-                page.wait_for_timeout(1500)
             except Exception as e:
                 print(f"Could not load page: {e}")
                 continue
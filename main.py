@@ -1,13 +1,20 @@
 import requests
-import pandas as pd
+import httpx
+import orjson
 import re
 import time
+import random
 import os
-import base64
+import threading
+import queue
+import functools
 import concurrent.futures
-from collections import deque
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from collections import deque, defaultdict
+import lxml.html
+from lxml import etree
+from urllib.parse import urljoin, urlparse, urlsplit
+import cache
+from exporter import ExcelStreamWriter, checkpoint_path, load_existing_users
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -17,16 +24,235 @@ except ImportError:
 # --- CONFIGURATION ---
 GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')
 REPO = 'surge-downloader/surge'
+OUTPUT_FILE = 'surge_leads.xlsx'
 HEADERS = {'Authorization': f'token {GITHUB_TOKEN}'} if GITHUB_TOKEN else {}
+USE_GRAPHQL = True  # Fetch stargazers + profiles in one GraphQL query (needs a token)
+GRAPHQL_URL = 'https://api.github.com/graphql'
+API_TIMEOUT = 30  # Seconds to wait for a GitHub API response
+MAX_WORKERS = 20  # Users processed concurrently
+CRAWL_WORKERS = 10  # Of those, how many may be crawling a blog at once
+CRAWL_PER_HOST = 2  # Page fetches in flight per host (e.g. many blogs on medium.com)
+MAX_PENDING = 100  # Users queued ahead of the workers before pagination pauses
+PREFETCH_USERS = 200  # Stargazers fetched ahead of submission (about two pages)
+RATE_LIMIT_PACE_BELOW = 500  # Spread requests evenly once fewer calls than this remain
+RATE_LIMIT_MAX_RETRIES = 3  # Retries after a 403/429 rate-limit response
+TRANSIENT_MAX_RETRIES = 3  # Retries after a timeout, dropped connection or 502/503/504
+RETRY_BACKOFF = 0.5  # Seconds before the first transient retry; doubles each time (plus jitter)
 TIMEOUT = 15  # Seconds to wait for a blog to load
 CRAWL_MAX_DEPTH = 5  # Max link-follow depth for blog crawling
 CRAWL_MAX_PAGES = 25  # Max pages to visit per blog
+CRAWL_MAX_BYTES = 2 * 1024 * 1024  # Only the first 2 MB of a page are read and scanned
+# How long a blog crawl result is reused before the site is crawled again,
+# by outcome ('error' = the site itself couldn't be loaded)
+SITE_CACHE_TTL = {'found': 30 * 86400, 'not_found': 7 * 86400, 'error': 86400}
+PROFILE_CACHE_TTL = 7 * 86400  # How long a fetched GitHub profile is reused across runs
+# Same-domain links with these extensions are never fetched: they can't be
+# parsed for links and are usually much bigger than the HTML pages
+CRAWL_SKIP_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.ico', '.bmp',
+    '.css', '.js', '.mjs', '.map', '.json', '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.mp3', '.mp4', '.webm', '.mov', '.avi', '.wav', '.ogg',
+    '.pdf', '.zip', '.gz', '.tgz', '.tar', '.rar', '.7z', '.exe', '.dmg', '.iso',
+})
+CRAWL_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                    'AppleWebKit/537.36 (KHTML, like Gecko) '
+                    'Chrome/91.0.4472.124 Safari/537.36')
 
 # --- LinkedIn URL pattern ---
 LINKEDIN_RE = re.compile(
     r'https?://(?:www\.)?linkedin\.com/(in|pub|company|profile/view)\b[^\s\'"<>]*',
     re.IGNORECASE,
 )
+# Same pattern for raw response bodies, so pages needn't be decoded to scan them
+LINKEDIN_BYTES_RE = re.compile(LINKEDIN_RE.pattern.encode(), re.IGNORECASE)
+
+# --- Link extraction for blog crawling (compiled once, plain str results) ---
+HREF_XPATH = etree.XPath('//a/@href', smart_strings=False)
+
+# --- Cache-Control max-age (seconds a response may be reused as-is) ---
+MAX_AGE_RE = re.compile(r'\bmax-age=(\d+)')
+
+# --- GraphQL stargazer query (100 users per request, profile fields inline) ---
+STARGAZERS_QUERY = '''
+query($owner: String!, $name: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    stargazers(first: 100, after: $after) {
+      pageInfo { endCursor hasNextPage }
+      nodes {
+        login name bio company location email isHireable
+        twitterUsername websiteUrl avatarUrl createdAt updatedAt url
+        followers { totalCount }
+        following { totalCount }
+        repositories(privacy: PUBLIC, ownerAffiliations: OWNER) { totalCount }
+        gists(privacy: PUBLIC) { totalCount }
+        socialAccounts(first: 10) { nodes { provider url } }
+      }
+    }
+  }
+}
+'''
+
+
+class RateLimiter:
+    """
+    Paces requests using GitHub's X-RateLimit-Remaining/X-RateLimit-Reset
+    headers. Once the remaining quota drops below RATE_LIMIT_PACE_BELOW, the
+    remaining calls are spread evenly over the time left until the reset,
+    so the quota is never exhausted and we never stall on a 403/429.
+    Thread-safe: one instance is shared by all worker threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = None
+        self.reset = 0.0
+        self.next_slot = 0.0
+
+    def wait(self):
+        """Block until the next request is allowed to go out."""
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot)
+            if self.remaining is not None and self.remaining < RATE_LIMIT_PACE_BELOW and now < self.reset:
+                self.next_slot = slot + (self.reset - now) / max(self.remaining, 1)
+            else:
+                self.next_slot = slot
+        if slot > now:
+            time.sleep(slot - now)
+
+    def observe(self, remaining, reset):
+        """Record the quota reported by the latest response."""
+        with self.lock:
+            self.remaining = remaining
+            self.reset = reset
+
+
+# REST and GraphQL have separate quotas on GitHub
+RATE_LIMITERS = {'core': RateLimiter(), 'graphql': RateLimiter()}
+
+# One thread-safe HTTP/2 client for all GitHub API calls, so requests from
+# every worker are multiplexed over a shared connection instead of each
+# paying for its own TCP/TLS handshake. The default transport is kept so
+# proxy/CA settings from the environment (HTTPS_PROXY, SSL_CERT_FILE, ...)
+# still apply; connection errors are retried in github_request().
+GITHUB_CLIENT = httpx.Client(
+    http2=True,
+    timeout=API_TIMEOUT,
+    follow_redirects=True,  # Renamed/transferred repos and users answer 301
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+
+def cache_lifetime(headers):
+    """Seconds a response may be reused without revalidation (Cache-Control)."""
+    cache_control = headers.get('Cache-Control', '')
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    match = MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def retry_delay(failures):
+    """
+    Exponential backoff for the nth transient failure, with up to 100%
+    random jitter so workers that failed together don't retry in lockstep.
+    """
+    return RETRY_BACKOFF * 2 ** (failures - 1) * (1 + random.random())
+
+
+def github_request(method, url, **kwargs):
+    """
+    Send a GitHub API request, paced by the shared rate limiter. If GitHub
+    still answers 403/429 because a limit was hit, wait for the advertised
+    Retry-After/reset time and retry (up to RATE_LIMIT_MAX_RETRIES times).
+    Transient failures (timeouts, dropped connections, 502/503/504) are
+    retried with exponential backoff, up to TRANSIENT_MAX_RETRIES times;
+    anything else (e.g. 404) is returned as-is.
+
+    GET responses are cached on disk. Within their Cache-Control max-age
+    they are served without touching the network; after that, repeat
+    requests are sent as conditional requests (ETag/Last-Modified), and a
+    304 (which doesn't count against the rate limit) is answered from the
+    cache as if it were a 200.
+    """
+    kwargs.setdefault('headers', HEADERS)
+    limiter = RATE_LIMITERS['graphql' if url == GRAPHQL_URL else 'core']
+
+    cached = cache.get_response(url) if method == 'GET' else None
+    if cached:
+        etag, last_modified, body, expires_at = cached
+        if time.time() < expires_at:
+            return httpx.Response(200, content=body, request=httpx.Request(method, url))
+
+        validators = {}
+        if etag:
+            validators['If-None-Match'] = etag
+        if last_modified:
+            validators['If-Modified-Since'] = last_modified
+        kwargs['headers'] = {**kwargs['headers'], **validators}
+
+    rate_limited = 0
+    failures = 0
+    while True:
+        limiter.wait()
+        try:
+            response = GITHUB_CLIENT.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if failures == TRANSIENT_MAX_RETRIES:
+                raise
+            failures += 1
+            delay = retry_delay(failures)
+            print(f"  [!] GitHub request failed ({e!r}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            continue
+
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None:
+            limiter.observe(int(remaining), float(reset))
+
+        if response.status_code in (502, 503, 504) and failures < TRANSIENT_MAX_RETRIES:
+            failures += 1
+            delay = retry_delay(failures)
+            print(f"  [!] GitHub answered {response.status_code}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in (403, 429) or rate_limited == RATE_LIMIT_MAX_RETRIES:
+            break
+
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            delay = float(retry_after)
+        elif remaining == '0' and reset is not None:
+            delay = max(0.0, float(reset) - time.time()) + 1
+        else:
+            break  # A real 403 (e.g. forbidden), not a rate limit
+
+        print(f"  [!] Rate limited by GitHub, waiting {delay:.0f}s...")
+        rate_limited += 1
+        time.sleep(delay)
+
+    if cached and response.status_code == 304:
+        # Unchanged since we cached it: serve the stored (already decoded)
+        # body. Only validator, caching and rate-limit headers carry over;
+        # entity headers like Content-Encoding/Length describe the 304.
+        headers = {k: v for k, v in (('ETag', etag), ('Last-Modified', last_modified)) if v}
+        headers.update(
+            (k, v) for k, v in response.headers.items()
+            if k.lower() in ('etag', 'last-modified', 'cache-control')
+            or k.lower().startswith('x-ratelimit-')
+        )
+        response = httpx.Response(200, headers=headers, content=body,
+                                  request=response.request)
+    if method == 'GET' and response.status_code == 200:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            expires_at = time.time() + cache_lifetime(response.headers)
+            cache.put_response(url, etag, last_modified, response.content, expires_at)
+
+    return response
 
 
 def is_linkedin_url(url):
@@ -35,46 +261,184 @@ def is_linkedin_url(url):
 
 
 def extract_linkedin_url(text):
-    """Extract the first LinkedIn URL from a block of text."""
+    """Extract the first LinkedIn URL from a block of text (str or raw bytes)."""
+    if isinstance(text, bytes):
+        match = LINKEDIN_BYTES_RE.search(text)
+        return match.group(0).decode('utf-8', 'replace') if match else None
     match = LINKEDIN_RE.search(text)
     return match.group(0) if match else None
 
 
+def parse_repo(repo):
+    """
+    Split 'owner/name' (or a https://github.com/owner/name URL) into an
+    (owner, name) tuple. Raises ValueError on anything else, so bad input
+    fails before any request is made.
+    """
+    repo = repo.strip()
+    if '://' in repo:
+        parts = urlsplit(repo)
+        if parts.netloc.lower() not in ('github.com', 'www.github.com'):
+            raise ValueError(f"Not a GitHub repository URL: {repo!r}")
+        repo = parts.path
+
+    owner, _, name = repo.strip('/').removesuffix('.git').rpartition('/')
+    if not owner or not name or '/' in owner:
+        raise ValueError(f"Expected 'owner/name' or a GitHub repository URL, got {repo!r}")
+    return owner, name
+
+
 def get_stargazers(repo):
-    """Fetches all stargazers for a repo."""
-    stargazers = []
+    """Yields the login of every stargazer for a repo, one page at a time."""
     page = 1
     while True:
         url = f'https://api.github.com/repos/{repo}/stargazers?page={page}&per_page=100'
         try:
-            response = requests.get(url, headers=HEADERS)
+            response = github_request('GET', url)
             if response.status_code != 200:
-                print(f"Error fetching stargazers: {response.json()}")
+                print(f"Error fetching stargazers: {orjson.loads(response.content)}")
                 break
             
-            users = response.json()
+            users = orjson.loads(response.content)
             if not users:
                 break
             
+            print(f"Fetched page {page} ({len(users)} users)...")
             for user in users:
-                stargazers.append(user['login'])
+                yield user['login']
             
-            print(f"Fetched page {page} ({len(users)} users)...")
             page += 1
         except Exception as e:
             print(f"API Error: {e}")
             break
-            
-    return stargazers
+
+
+def graphql_user_to_profile(node):
+    """
+    Map a GraphQL User node onto the REST /users/{username} dict shape, with
+    the social accounts inlined under 'social_accounts'.
+    """
+    return {
+        'login': node['login'],
+        'name': node.get('name'),
+        'bio': node.get('bio'),
+        'company': node.get('company'),
+        'location': node.get('location'),
+        'email': node.get('email') or None,  # GraphQL uses '' for hidden emails
+        'hireable': node.get('isHireable') or None,
+        'twitter_username': node.get('twitterUsername'),
+        'blog': node.get('websiteUrl'),
+        'followers': node['followers']['totalCount'],
+        'following': node['following']['totalCount'],
+        'public_repos': node['repositories']['totalCount'],
+        'public_gists': node['gists']['totalCount'],
+        'avatar_url': node.get('avatarUrl'),
+        'created_at': node.get('createdAt'),
+        'updated_at': node.get('updatedAt'),
+        'html_url': node.get('url'),
+        'social_accounts': [
+            {'provider': s['provider'].lower(), 'url': s['url']}
+            for s in node['socialAccounts']['nodes']
+        ],
+    }
+
+
+def get_stargazers_graphql(repo):
+    """
+    Yields every stargazer for a repo as a REST-shaped profile dict (see
+    graphql_user_to_profile), fetching 100 users per GraphQL request.
+    """
+    owner, name = parse_repo(repo)
+    cursor = None
+    page = 1
+    while True:
+        variables = {'owner': owner, 'name': name, 'after': cursor}
+        try:
+            response = github_request('POST', GRAPHQL_URL, json={
+                'query': STARGAZERS_QUERY,
+                'variables': variables,
+            })
+            payload = orjson.loads(response.content)
+            if response.status_code != 200 or payload.get('errors'):
+                print(f"Error fetching stargazers: {payload.get('errors') or payload}")
+                break
+
+            stargazers = payload['data']['repository']['stargazers']
+            nodes = stargazers['nodes']
+            print(f"Fetched page {page} ({len(nodes)} users)...")
+            for node in nodes:
+                yield graphql_user_to_profile(node)
+
+            if not stargazers['pageInfo']['hasNextPage']:
+                break
+            cursor = stargazers['pageInfo']['endCursor']
+            page += 1
+        except Exception as e:
+            print(f"API Error: {e}")
+            break
+
+
+class Prefetcher:
+    """
+    Iterates `iterable` in a background thread, buffering up to `size` items
+    ahead of the consumer, so the next stargazer page is already being
+    fetched while the current one is handed out. close() stops the producer
+    before it asks for another item (i.e. another page) and waits for it.
+    """
+
+    _DONE = object()
+
+    def __init__(self, iterable, size):
+        self.buffer = queue.Queue(maxsize=size)
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._produce, args=(iterable,), daemon=True)
+        self.thread.start()
+
+    def _produce(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put(item) or self.stop.is_set():
+                    break
+        finally:
+            self._put(self._DONE)
+
+    def _put(self, item):
+        """Queue `item`; gives up (returns False) once stop is set."""
+        while not self.stop.is_set():
+            try:
+                self.buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __iter__(self):
+        while (item := self.buffer.get()) is not self._DONE:
+            yield item
+
+    def close(self, timeout=API_TIMEOUT):
+        """Stop the producer and wait (up to `timeout`) for it to exit."""
+        self.stop.set()
+        self.thread.join(timeout)
 
 
 def get_user_profile(username):
-    """Fetches public profile data from GitHub."""
+    """
+    Fetches public profile data from GitHub. Profiles are kept in the
+    on-disk user cache for PROFILE_CACHE_TTL, so a crashed or repeated run
+    doesn't pay for them again.
+    """
+    cached = cache.get_user(username, PROFILE_CACHE_TTL)
+    if cached:
+        return cached
+
     url = f'https://api.github.com/users/{username}'
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = github_request('GET', url)
         if response.status_code == 200:
-            return response.json()
+            profile = orjson.loads(response.content)
+            cache.put_user(username, profile)
+            return profile
     except Exception as e:
         print(f"  [!] Error fetching profile for {username}: {e}")
     return None
@@ -84,9 +448,9 @@ def get_social_accounts(username):
     """Fetches social accounts from GitHub."""
     url = f'https://api.github.com/users/{username}/social_accounts'
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = github_request('GET', url)
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
     except Exception as e:
         print(f"  [!] Error fetching social accounts for {username}: {e}")
     return []
@@ -99,7 +463,7 @@ def get_readme_linkedin(username):
     """
     url = f'https://api.github.com/repos/{username}/{username}/readme'
     try:
-        response = requests.get(url, headers={
+        response = github_request('GET', url, headers={
             **HEADERS,
             'Accept': 'application/vnd.github.raw+json',
         })
@@ -113,11 +477,86 @@ def get_readme_linkedin(username):
     return None
 
 
+# Blog crawls are slow and hit arbitrary hosts, so only CRAWL_WORKERS of the
+# MAX_WORKERS threads crawl at a time; the rest keep making (rate-limited)
+# GitHub API calls instead of queueing behind them.
+_crawl_slots = threading.BoundedSemaphore(CRAWL_WORKERS)
+# Sites being crawled right now (cache key -> Event set when done), so
+# stargazers sharing a blog wait for one crawl instead of each running it
+_crawls_lock = threading.Lock()
+_crawls_in_flight = {}
+# Per-host fetch slots, so workers crawling different blogs on one host
+# don't hammer it (and get throttled) all at once
+_host_slots = defaultdict(lambda: threading.BoundedSemaphore(CRAWL_PER_HOST))
+_thread_local = threading.local()
+_crawl_sessions = []  # Every crawl session handed out, so they can be closed
+
+
+def get_crawl_session():
+    """
+    Return this worker thread's persistent crawl session. Each worker keeps
+    one session for its lifetime, so connections are reused across the pages
+    of a site (and across users) instead of being reopened for every URL.
+    """
+    session = getattr(_thread_local, 'crawl_session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = CRAWL_USER_AGENT
+        _thread_local.crawl_session = session
+        _crawl_sessions.append(session)
+    return session
+
+
+def close_connections():
+    """Close the shared GitHub client, crawl sessions and cache database."""
+    GITHUB_CLIENT.close()
+    for session in _crawl_sessions:
+        session.close()
+    _crawl_sessions.clear()
+    cache.close()
+
+
+def read_capped(response, limit):
+    """
+    Read at most `limit` bytes of a streamed response body and close it, so
+    one huge page can't balloon a worker's memory.
+    """
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                break
+    finally:
+        response.close()
+    return b''.join(chunks)[:limit]
+
+
+def site_cache_key(url):
+    """
+    Canonical form of a blog URL for the site cache: case-insensitive
+    scheme and host, no fragment, no trailing slash.
+    """
+    parts = urlsplit(url)
+    return parts._replace(
+        scheme=parts.scheme.lower(),
+        netloc=parts.netloc.lower(),
+        path=parts.path.rstrip('/'),
+        fragment='',
+    ).geturl()
+
+
 def crawl_site_for_linkedin(start_url, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAWL_MAX_PAGES):
     """
     BFS-crawl a website up to `max_depth` link-hops and `max_pages` total
     pages, looking for LinkedIn URLs. Only follows same-domain links.
     Returns the first LinkedIn URL found, or None.
+
+    Outcomes are cached per site for SITE_CACHE_TTL, including misses and
+    unreachable sites, so shared or dead blogs aren't crawled again. If
+    another worker is already crawling the same site, its result is reused.
     """
     if not start_url:
         return None
@@ -125,7 +564,43 @@ def crawl_site_for_linkedin(start_url, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAW
     # Ensure URL has schema
     if not start_url.startswith(('http://', 'https://')):
         start_url = 'http://' + start_url
+    key = site_cache_key(start_url)
+
+    with _crawls_lock:
+        in_flight = _crawls_in_flight.get(key)
+        if in_flight is None:
+            _crawls_in_flight[key] = threading.Event()
+    if in_flight is not None:
+        in_flight.wait()
+
+    try:
+        cached = cache.get_site(key)
+        if cached:
+            status, linkedin, fetched_at = cached
+            if time.time() - fetched_at < SITE_CACHE_TTL.get(status, 0):
+                print(f"   --> Crawl of {start_url} cached ({status})")
+                return linkedin
+
+        try:
+            status, linkedin = _crawl_site(start_url, max_depth, max_pages)
+        except Exception as e:
+            # Still record a result, so workers waiting on this crawl don't
+            # all retry the misbehaving site at once
+            print(f"   [!] Crawl of {start_url} failed: {e}")
+            status, linkedin = 'error', None
+        cache.put_site(key, status, linkedin)
+        return linkedin
+    finally:
+        if in_flight is None:
+            with _crawls_lock:
+                _crawls_in_flight.pop(key).set()
+
 
+def _crawl_site(start_url, max_depth, max_pages):
+    """
+    The crawl behind crawl_site_for_linkedin. Returns (status, linkedin)
+    where status is 'found', 'not_found' or 'error' (nothing loaded).
+    """
     parsed_start = urlparse(start_url)
     base_domain = parsed_start.netloc.lower()
 
@@ -133,11 +608,8 @@ def crawl_site_for_linkedin(start_url, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAW
     queue = deque()  # (url, depth)
     queue.append((start_url, 0))
 
-    request_headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                       'AppleWebKit/537.36 (KHTML, like Gecko) '
-                       'Chrome/91.0.4472.124 Safari/537.36'
-    }
+    session = get_crawl_session()
+    pages_loaded = 0
 
     while queue and len(visited) < max_pages:
         current_url, depth = queue.popleft()
@@ -148,43 +620,61 @@ def crawl_site_for_linkedin(start_url, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAW
 
         print(f"   --> Crawling (depth {depth}) {current_url}")
 
+        with _crawls_lock:
+            host_slot = _host_slots[base_domain]
         try:
-            response = requests.get(current_url, headers=request_headers, timeout=TIMEOUT)
-            if response.status_code != 200:
-                continue
+            with host_slot:
+                # Stream so non-HTML bodies can be dropped without downloading them
+                response = session.get(current_url, timeout=TIMEOUT, stream=True)
+                if (response.status_code != 200
+                        or 'html' not in response.headers.get('Content-Type', 'text/html')):
+                    response.close()
+                    continue
+                body = read_capped(response, CRAWL_MAX_BYTES)
         except Exception:
             continue
+        pages_loaded += 1
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        try:
+            # Parse the bytes so lxml can honour the page's declared charset
+            hrefs = HREF_XPATH(lxml.html.fromstring(body))
+        except (ValueError, etree.ParserError):
+            hrefs = []  # Empty or unparseable document
 
         # Check every link on this page
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute = urljoin(current_url, href)
+        for href in hrefs:
+            absolute = urljoin(current_url, href.strip())
 
             # Check if this link itself is a LinkedIn URL
             if is_linkedin_url(absolute):
-                return absolute
+                return 'found', absolute
 
             # Queue same-domain links for further crawling
             if depth < max_depth:
                 parsed = urlparse(absolute)
-                if parsed.netloc.lower() == base_domain and absolute not in visited:
+                if (parsed.netloc.lower() == base_domain and absolute not in visited
+                        and os.path.splitext(parsed.path)[1].lower() not in CRAWL_SKIP_EXTENSIONS):
                     queue.append((absolute, depth + 1))
 
-        # Also scan raw page text for LinkedIn URLs not wrapped in <a> tags
-        text_match = extract_linkedin_url(response.text)
+        # Also scan the raw page for LinkedIn URLs not wrapped in <a> tags
+        # (as bytes, so requests never has to guess the page's encoding)
+        text_match = extract_linkedin_url(body)
         if text_match:
-            return text_match
+            return 'found', text_match
 
-    return None
+    return ('not_found' if pages_loaded else 'error'), None
 
 
-def process_user(username):
-    """Process a single user and return their info dict."""
+def process_user(username, profile=None):
+    """
+    Process a single user and return their info dict. `profile` may be a
+    prefetched profile (e.g. from get_stargazers_graphql) to skip the REST
+    profile and social-account lookups.
+    """
     try:
         print(f"Checking {username}...")
-        profile = get_user_profile(username)
+        if profile is None:
+            profile = get_user_profile(username)
 
         if not profile:
             return None
@@ -194,7 +684,9 @@ def process_user(username):
         linkedin_source = None
 
         # --- Gather all social account URLs ---
-        socials = get_social_accounts(username)
+        socials = profile.get('social_accounts')
+        if socials is None:
+            socials = get_social_accounts(username)
         all_social_urls = [s.get('url', '') for s in socials if s.get('url')]
 
         # 1) Check social accounts for LinkedIn
@@ -207,7 +699,8 @@ def process_user(username):
 
         # 2) If not found in socials, and they have a blog, crawl it
         if not linkedin_url and blog_url:
-            linkedin_url = crawl_site_for_linkedin(blog_url)
+            with _crawl_slots:
+                linkedin_url = crawl_site_for_linkedin(blog_url)
             if linkedin_url:
                 linkedin_source = 'blog'
                 print(f"   --> Found LinkedIn for {username} (blog crawl): {linkedin_url}")
@@ -219,10 +712,7 @@ def process_user(username):
                 linkedin_source = 'readme'
                 print(f"   --> Found LinkedIn for {username} (README): {linkedin_url}")
 
-        # Respectful pause (per thread)
-        time.sleep(0.2)
-
-        return {
+        result = {
             'Username': username,
             'Name': profile.get('name'),
             'Bio': profile.get('bio'),
@@ -244,100 +734,116 @@ def process_user(username):
             'Updated_At': profile.get('updated_at'),
             'GitHub_URL': profile.get('html_url'),
         }
+        return result
     except Exception as e:
         print(f"Error processing {username}: {e}")
     return None
 
 
 def main():
-    print(f"Starting crawl for {REPO}...")
-    stargazers = get_stargazers(REPO)
-
-    final_data = []
-    processed_usernames = set()
-
-    # Load existing data if available to resume
-    if os.path.exists('surge_leads.xlsx'):
-        print("Found existing 'surge_leads.xlsx', loading to resume...")
-        try:
-            existing_df = pd.read_excel('surge_leads.xlsx')
-            if 'Username' in existing_df.columns:
-                processed_usernames = set(existing_df['Username'].tolist())
-                final_data = existing_df.to_dict('records')
-                print(f"Loaded {len(final_data)} existing records.")
-        except Exception as e:
-            print(f"Could not load existing file: {e}")
+    try:
+        owner, name = parse_repo(REPO)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    repo = f'{owner}/{name}'
+    print(f"Starting crawl for {repo}...")
 
-    # Filter out already processed users
-    users_to_process = [u for u in stargazers if u not in processed_usernames]
-    total = len(users_to_process)
+    # Load existing data if available to resume. Users in it are skipped
+    # before any per-user API call or blog crawl is made.
+    existing_rows = load_existing_users(OUTPUT_FILE)
+    processed_usernames = {row['Username'] for row in existing_rows}
 
-    if total == 0:
-        print("All users already processed!")
-        return
+    # (username, prefetched profile or None) pairs, streamed page by page
+    if USE_GRAPHQL and GITHUB_TOKEN:
+        stargazers = ((p['login'], p) for p in get_stargazers_graphql(repo))
+    else:
+        stargazers = ((u, None) for u in get_stargazers(repo))
+    stargazers = Prefetcher(stargazers, PREFETCH_USERS)
 
-    print(f"\nProcessing {total} new profiles (skipped {len(processed_usernames)}).")
     print("Press Ctrl+C to stop and save progress.\n")
 
-    executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+    writer = None
+
+    def open_writer():
+        # Rows are streamed into the workbook as they complete; it is
+        # written out to disk once at the end.
+        new_writer = ExcelStreamWriter(OUTPUT_FILE)
+        for row in existing_rows:
+            new_writer.append(row, checkpoint=False)
+        existing_rows.clear()
+        return new_writer
+
+    # Back-pressure: the producer (stargazer pagination) may only run
+    # MAX_PENDING users ahead of the workers, so memory stays bounded.
+    pending = threading.BoundedSemaphore(MAX_PENDING)
+    progress_lock = threading.Lock()
+    submitted = 0
+    completed = 0
+
+    def collect(user, future):
+        # Runs as each task finishes, so results are streamed into the
+        # workbook even while later stargazer pages are still being fetched.
+        nonlocal completed
+        pending.release()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            print(f'{user} generated an exception: {future.exception()}')
+        elif future.result():
+            writer.append(future.result())
+
+        with progress_lock:
+            completed += 1
+            if completed % 10 == 0:
+                print(f"Progress: {completed}/{submitted}")
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
     try:
-        # Submit all tasks
-        future_to_user = {executor.submit(process_user, user): user for user in users_to_process}
-
-        completed_count = 0
-        for future in concurrent.futures.as_completed(future_to_user):
-            user = future_to_user[future]
-            try:
-                result = future.result()
-                if result:
-                    final_data.append(result)
-
-                completed_count += 1
-                if completed_count % 10 == 0:
-                    print(f"Progress: {completed_count}/{total}")
-
-            except Exception as exc:
-                print(f'{user} generated an exception: {exc}')
+        # Submit users as each stargazer page arrives, so the workers start
+        # processing while later pages are still being fetched.
+        skipped = 0
+        for user, profile in stargazers:
+            if user in processed_usernames:
+                skipped += 1
+                continue
+            if writer is None:
+                writer = open_writer()
+
+            pending.acquire()
+            future = executor.submit(process_user, user, profile)
+            submitted += 1
+            future.add_done_callback(functools.partial(collect, user))
+
+        if submitted == 0:
+            print("All users already processed!")
+            if os.path.exists(checkpoint_path(OUTPUT_FILE)):
+                # Still merge rows recovered from an unfinished run
+                writer = open_writer()
+            return
+
+        print(f"\nFetched all stargazers: processing {submitted} new profiles (skipped {skipped}).")
+        executor.shutdown(wait=True)
 
     except KeyboardInterrupt:
         print("\n\nStopping script (KeyboardInterrupt)...")
         print("Cancelling pending tasks...")
         executor.shutdown(wait=False, cancel_futures=True)
-        print("Waiting for currently running tasks to finish (max 5)...")
+        print("Waiting for currently running tasks to finish...")
     except Exception as e:
         print(f"\n\nAn unexpected error occurred: {e}")
+        # Like a TaskGroup: one failure cancels the work that hasn't started
+        executor.shutdown(wait=False, cancel_futures=True)
     finally:
-        # Ensure executor is closed
+        # Stop pagination and the executor before closing the connections
+        # (and cache) they use
+        stargazers.close()
         executor.shutdown(wait=True)
+        close_connections()
 
-        # Export — always try to save, fall back to CSV if Excel fails
-        print("\nSaving progress...")
-        if final_data:
-            df = pd.DataFrame(final_data)
-
-            # Reorder columns — most important stuff first
-            cols = [
-                'Name', 'Found_LinkedIn', 'LinkedIn_Source', 'Bio',
-                'Company', 'Email', 'Hireable', 'Twitter', 'Website',
-                'All_Social_Links', 'Followers', 'Following',
-                'Public_Repos', 'Public_Gists',
-                'Username', 'GitHub_URL', 'Avatar_URL',
-                'Created_At', 'Updated_At',
-            ]
-            # Filter to only include cols that actually exist
-            cols = [c for c in cols if c in df.columns]
-            # Add remaining columns not in our preferred order
-            df = df[cols + [c for c in df.columns if c not in cols]]
-
-            try:
-                df.to_excel('surge_leads.xlsx', index=False)
-                print(f"Done! Saved {len(df)} records to 'surge_leads.xlsx'.")
-            except Exception as save_err:
-                print(f"Excel save failed ({save_err}), falling back to CSV...")
-                df.to_csv('surge_leads.csv', index=False)
-                print(f"Saved {len(df)} records to 'surge_leads.csv'.")
-        else:
-            print("No data to save.")
+        # Export — always try to save, unless there was nothing new to do
+        if writer is not None:
+            writer.close()
 
 
 if __name__ == '__main__':